@@ -1,4 +1,4 @@
-version = "1.0.0"
+version = "1.0.1"
 
 # compat.py
 #
@@ -66,7 +66,22 @@ def make_output_pin(gpio):
 # -------------------------------------------------------------
 # TIMER WRAPPER
 # -------------------------------------------------------------
-def start_periodic_timer(callback, tick_us=1000):
+def _init_timer(t, callback, hard, **timing):
+    """
+    Init a periodic timer, asking for hard (ISR) dispatch when requested.
+    Ports whose Timer.init() has no 'hard' keyword fall back to the
+    normal scheduled callback.
+    """
+    if hard:
+        try:
+            t.init(mode=machine.Timer.PERIODIC, callback=callback, hard=True, **timing)
+            return
+        except TypeError:
+            pass
+    t.init(mode=machine.Timer.PERIODIC, callback=callback, **timing)
+
+
+def start_periodic_timer(callback, tick_us=1000, hard=False):
     """
     Start a periodic timer in a way that works on both ESP32 and RP2040.
 
@@ -75,6 +90,11 @@ def start_periodic_timer(callback, tick_us=1000):
       - ESP32 requiring timers 0–3
       - Pico supporting Timer(-1)
       - Timer callback signatures varying
+
+    hard=True requests that the callback runs straight from the timer
+    interrupt rather than being queued for the scheduler, which removes
+    the dispatch jitter on ESP32. A hard callback runs with the heap
+    locked, so it must not allocate (no prints, no new objects).
     """
 
     # ESP32 cannot safely run sub-ms ticks
@@ -83,19 +103,25 @@ def start_periodic_timer(callback, tick_us=1000):
         effective_tick_us = 1000
 
     # ---- NORMALISE CALLBACK SIGNATURE ----
-    def wrapped(*args, **kwargs):
-        try:
+    if hard:
+        # No *args or exception printing here: both allocate
+        def wrapped(t):
             callback()
-        except Exception as e:
+    else:
+        def wrapped(*args, **kwargs):
             try:
-                sys.print_exception(e)
-            except:
-                pass
+                callback()
+            except Exception as e:
+                try:
+                    sys.print_exception(e)
+                except:
+                    pass
 
     # ---- SELECT PLATFORM-SAFE TIMER INSTANCE ----
     if IS_ESP32:
         # Always choose Timer(0) on ESP32.
-        # It is guaranteed to exist and safe for periodic ISR use.
+        # It is a hardware (GPTimer) timer, guaranteed to exist and
+        # safe for periodic ISR use.
         try:
             t = machine.Timer(0)
         except Exception as e:
@@ -112,14 +138,14 @@ def start_periodic_timer(callback, tick_us=1000):
     try:
         freq = int(1_000_000 // effective_tick_us)
         if freq > 0:
-            t.init(freq=freq, mode=machine.Timer.PERIODIC, callback=wrapped)
+            _init_timer(t, wrapped, hard, freq=freq)
             return t
     except Exception:
         pass
 
     # ---- FALL BACK TO PERIOD (milliseconds) ----
     period_ms = max(1, effective_tick_us // 1000)
-    t.init(period=period_ms, mode=machine.Timer.PERIODIC, callback=wrapped)
+    _init_timer(t, wrapped, hard, period=period_ms)
     return t
 
 def cancel_timer(timer):
@@ -1,4 +1,4 @@
-version = "1.0.0"
+version = "1.0.1"
 
 from graphics.colours import BLACK,RED,GREEN,BLUE
 
@@ -30,8 +30,10 @@ class LightPanel:
         if pixeltype == "GRB":
             print("GRB Pixels")
             self.write_col = self.write_grb
+            self.swap_rg = False
         else:
             self.write_col = self.write_rgb
+            self.swap_rg = True
             print("RGB Pixels")
     
     def clear_col(self, colour=BLACK):
@@ -51,9 +53,19 @@ class LightPanel:
             brightness=1
         self.brightness=float(brightness)
             
+    def colour_bytes(self,r,g,b):
+        """Return a colour as 3 bytes in buffer order with brightness applied."""
+        br=self.brightness
+        if self.swap_rg:
+            return bytes((int(g*br),int(r*br),int(b*br)))
+        return bytes((int(r*br),int(g*br),int(b*br)))
+
+    def fill_bytes(self,colour3):
+        """Fill the whole buffer with a 3 byte colour that is already in buffer order."""
+        self.buf[:] = colour3 * (len(self.buf)//3)
+
     def clear_rgb(self,r=0,g=0,b=0):
-        for p in range(0,self.map.pixel_bytes,3):
-            self.write_col(p,r,g,b )
+        self.fill_bytes(self.colour_bytes(r,g,b))
 
     def wash_rgb(self,r,g,b):
         for p in range(0,self.map.pixel_bytes,3):
@@ -93,3 +105,12 @@ class LightPanel:
         """Set one pixel at position (x,y) to a colour."""
         p = self.get_offset(x, y)
         self.write_col(p,r,g,b)
+
+    def set_pixels_rgb(self, cells, r, g, b):
+        """Set each pixel in a flat x0,y0,x1,y1... sequence to one colour."""
+        colour3 = self.colour_bytes(r,g,b)
+        get_offset = self.get_offset
+        dest = self.buf
+        for i in range(0, len(cells), 2):
+            p = get_offset(cells[i], cells[i + 1])
+            dest[p:p+3] = colour3
@@ -6,12 +6,134 @@ import random
 import machine
 import sys
 import os
+import gc
 from HullOS.task import Task
 from HullOS.engine import Engine
 from graphics.colours import find_random_colour
 
+# Words for 0-30 minutes past (or to) the hour, indexed by minutes
+_NUMBER_WORDS = (
+    (),
+    ("ONE",),
+    ("TWO",),
+    ("THREE",),
+    ("FOUR",),
+    ("FIVE",),
+    ("SIX",),
+    ("SEVEN",),
+    ("EIGHT",),
+    ("NINE",),
+    ("TEN",),
+    ("ELEVEN",),
+    ("TWELVE",),
+    ("THIRTEEN",),
+    ("FOURTEEN",),
+    ("QUARTER",),
+    ("SIXTEEN",),
+    ("SEVENTEEN",),
+    ("EIGHTEEN",),
+    ("NINETEEN",),
+    ("TWENTY",),
+    ("TWENTY", "ONE"),
+    ("TWENTY", "TWO"),
+    ("TWENTY", "THREE"),
+    ("TWENTY", "FOUR"),
+    ("TWENTY", "FIVE"),
+    ("TWENTY", "SIX"),
+    ("TWENTY", "SEVEN"),
+    ("TWENTY", "EIGHT"),
+    ("TWENTY", "NINE"),
+    ("HALF",),
+)
+
+# Words for the numbers 0-59, indexed by number
+_NUMBER_WORDS_TO_SIXTY = (
+    ("ZERO",),
+    ("ONE",),
+    ("TWO",),
+    ("THREE",),
+    ("FOUR",),
+    ("FIVE",),
+    ("SIX",),
+    ("SEVEN",),
+    ("EIGHT",),
+    ("NINE",),
+    ("TEN",),
+    ("ELEVEN",),
+    ("TWELVE",),
+    ("THIRTEEN",),
+    ("FOURTEEN",),
+    ("FIFTEEN",),
+    ("SIXTEEN",),
+    ("SEVENTEEN",),
+    ("EIGHTEEN",),
+    ("NINETEEN",),
+    ("TWENTY",),
+    ("TWENTY", "ONE"),
+    ("TWENTY", "TWO"),
+    ("TWENTY", "THREE"),
+    ("TWENTY", "FOUR"),
+    ("TWENTY", "FIVE"),
+    ("TWENTY", "SIX"),
+    ("TWENTY", "SEVEN"),
+    ("TWENTY", "EIGHT"),
+    ("TWENTY", "NINE"),
+    ("THIRTY",),
+    ("THIRTY", "ONE"),
+    ("THIRTY", "TWO"),
+    ("THIRTY", "THREE"),
+    ("THIRTY", "FOUR"),
+    ("THIRTY", "FIVE"),
+    ("THIRTY", "SIX"),
+    ("THIRTY", "SEVEN"),
+    ("THIRTY", "EIGHT"),
+    ("THIRTY", "NINE"),
+    ("FORTY",),
+    ("FORTY", "ONE"),
+    ("FORTY", "TWO"),
+    ("FORTY", "THREE"),
+    ("FORTY", "FOUR"),
+    ("FORTY", "FIVE"),
+    ("FORTY", "SIX"),
+    ("FORTY", "SEVEN"),
+    ("FORTY", "EIGHT"),
+    ("FORTY", "NINE"),
+    ("FIFTY",),
+    ("FIFTY", "ONE"),
+    ("FIFTY", "TWO"),
+    ("FIFTY", "THREE"),
+    ("FIFTY", "FOUR"),
+    ("FIFTY", "FIVE"),
+    ("FIFTY", "SIX"),
+    ("FIFTY", "SEVEN"),
+    ("FIFTY", "EIGHT"),
+    ("FIFTY", "NINE"),
+)
+
+# Indexed by hour 0-12
+_HOUR_WORDS = (
+    "TWELVE", "ONE", "TWO", "THREE", "FOUR", "FIVE", "SIX",
+    "SEVEN", "EIGHT", "NINE", "TEN", "ELEVEN", "TWELVE",
+)
+
+# Every phrase is the minute words, then the hour word, then
+# OCLOCK on the hour, so one table per minute covers all times:
+# (words before the hour, hour offset, words after the hour)
+_MINUTE_PHRASES = tuple(
+    ((), 0, ("OCLOCK",)) if minute == 0 else
+    (_NUMBER_WORDS[minute] + ("PAST",), 0, ()) if minute <= 30 else
+    (_NUMBER_WORDS[60 - minute] + ("TO",), 1, ())
+    for minute in range(60)
+)
+
+def _shuffle(items):
+    # MicroPython's random module has no shuffle, so Fisher-Yates in place
+    for i in range(len(items) - 1, 0, -1):
+        j = random.randrange(i + 1)
+        items[i], items[j] = items[j], items[i]
+
 class Manager(CLBManager):
-    version = "1.0.1"
+    version = "1.1.0"
 
     SHOW_INACTIVE="inactive"
     SHOW_WORDS="showing words"
@@ -24,7 +146,7 @@ class Manager(CLBManager):
     ALARM_ENABLED_BACKGROUND_COLOUR=(255,10,10)
     ALARM_OFF_BACKGROUND_COLOUR=(255,255,10)
     ALARM_TEXT_COLOUR=(20,20,20)
-    
+
     def __init__(self,clb):
         super().__init__(clb,defaults={
             "wordsearch_file": "Clock.json",
@@ -34,185 +156,38 @@ class Manager(CLBManager):
             "run_on_power_up":True,
             "alarm_enabled": False,
             "alarm_hour": 7,
-            "alarm_min": 0 
+            "alarm_min": 0,
+            "wordsearch_debug": False
             
         })
         self.show_state = self.SHOW_INACTIVE
         self.pixels = None
-        self.word_positions = {}
+        self.words = []
         self.show_time_generator = None
         self.first_run=True
         self.hour_button_pressed=False
         self.min_button_pressed=False
-
-        # --- static word tables ---
-        self.number_words = {
-             0: (""),
-             1: ("ONE",),
-             2: ("TWO",),
-             3: ("THREE",),
-             4: ("FOUR",),
-             5: ("FIVE",),
-             6: ("SIX",),
-             7: ("SEVEN",),
-             8: ("EIGHT",),
-             9: ("NINE",),
-            10: ("TEN",),
-            11: ("ELEVEN",),
-            12: ("TWELVE",),
-            13: ("THIRTEEN",),
-            14: ("FOURTEEN",),
-            15: ("QUARTER",),
-            16: ("SIXTEEN",),
-            17: ("SEVENTEEN",),
-            18: ("EIGHTEEN",),
-            19: ("NINETEEN",),
-            20: ("TWENTY",),
-            21: ("TWENTY", "ONE"),
-            22: ("TWENTY", "TWO"),
-            23: ("TWENTY", "THREE"),
-            24: ("TWENTY", "FOUR"),
-            25: ("TWENTY", "FIVE"),
-            26: ("TWENTY", "SIX"),
-            27: ("TWENTY", "SEVEN"),
-            28: ("TWENTY", "EIGHT"),
-            29: ("TWENTY", "NINE"),
-            30: ("HALF",),
-        }
-        
-        self.number_words_to_sixty = {
-             0: ("ZERO",),
-             1: ("ONE",),
-             2: ("TWO",),
-             3: ("THREE",),
-             4: ("FOUR",),
-             5: ("FIVE",),
-             6: ("SIX",),
-             7: ("SEVEN",),
-             8: ("EIGHT",),
-             9: ("NINE",),
-            10: ("TEN",),
-            11: ("ELEVEN",),
-            12: ("TWELVE",),
-            13: ("THIRTEEN",),
-            14: ("FOURTEEN",),
-            15: ("FIFTEEN",),
-            16: ("SIXTEEN",),
-            17: ("SEVENTEEN",),
-            18: ("EIGHTEEN",),
-            19: ("NINETEEN",),
-            20: ("TWENTY",),
-            21: ("TWENTY", "ONE"),
-            22: ("TWENTY", "TWO"),
-            23: ("TWENTY", "THREE"),
-            24: ("TWENTY", "FOUR"),
-            25: ("TWENTY", "FIVE"),
-            26: ("TWENTY", "SIX"),
-            27: ("TWENTY", "SEVEN"),
-            28: ("TWENTY", "EIGHT"),
-            29: ("TWENTY", "NINE"),
-            30: ("THIRTY",),
-            31: ("THIRTY","ONE",),
-            32: ("THIRTY","TWO",),
-            33: ("THIRTY","THREE",),
-            34: ("THIRTY","FOUR",),
-            35: ("THIRTY","FIVE",),
-            36: ("THIRTY","SIX",),
-            37: ("THIRTY","SEVEN",),
-            38: ("THIRTY","EIGHT",),
-            39: ("THIRTY","NINE",),
-            40: ("FORTY",),
-            41: ("FORTY", "ONE"),
-            42: ("FORTY", "TWO"),
-            43: ("FORTY", "THREE"),
-            44: ("FORTY", "FOUR"),
-            45: ("FORTY", "FIVE"),
-            46: ("FORTY", "SIX"),
-            47: ("FORTY", "SEVEN"),
-            48: ("FORTY", "EIGHT"),
-            49: ("FORTY", "NINE"),
-            50: ("FIFTY",),
-            51: ("FIFTY", "ONE"),
-            52: ("FIFTY", "TWO"),
-            53: ("FIFTY", "THREE"),
-            54: ("FIFTY", "FOUR"),
-            55: ("FIFTY", "FIVE"),
-            56: ("FIFTY", "SIX"),
-            57: ("FIFTY", "SEVEN"),
-            58: ("FIFTY", "EIGHT"),
-            59: ("FIFTY", "NINE")
-        }
-
-        self.hour_words = {
-             0: "TWELVE",
-             1: "ONE",
-             2: "TWO",
-             3: "THREE",
-             4: "FOUR",
-             5: "FIVE",
-             6: "SIX",
-             7: "SEVEN",
-             8: "EIGHT",
-             9: "NINE",
-            10: "TEN",
-            11: "ELEVEN",
-            12: "TWELVE",
-        }
+        self.debug = False
 
     def get_time_words(self, hour, minute):
         """
         Return a tuple of word names for the given hour (0–23) and minute (0–59).
         Produces natural word-clock phrases (no 'minutes').
         """
-        hour = hour % 12
-        words = []
-
-        if minute == 0:
-            words.append(self.hour_words[hour])
-            words.extend(("OCLOCK",))
-            return tuple(words)
-
-        if minute <= 30:
-            # Past current hour
-            if minute == 15:
-                words.extend(("QUARTER", "PAST", self.hour_words[hour]))
-            elif minute == 30:
-                words.extend(("HALF", "PAST", self.hour_words[hour]))
-            elif minute == 1:
-                words.extend(("ONE", "PAST", self.hour_words[hour]))
-            else:
-                words.extend(self.number_words[minute])
-                words.extend(("PAST", self.hour_words[hour]))
-        else:
-            # To next hour
-            minutes_to = 60 - minute
-            next_hour = (hour + 1) % 12
-            if minutes_to == 15:
-                words.extend(("QUARTER", "TO", self.hour_words[next_hour]))
-            elif minutes_to == 1:
-                words.extend(("ONE", "TO", self.hour_words[next_hour]))
-            else:
-                words.extend(self.number_words[minutes_to])
-                words.extend(("TO", self.hour_words[next_hour]))
-
-        return tuple(words)
+        before, hour_offset, after = _MINUTE_PHRASES[minute]
+        return before + (_HOUR_WORDS[(hour + hour_offset) % 12],) + after
 
     def get_word_positions_for_time(self, hour, minute):
         """
-        Return list of placement dicts for all words needed to display this time.
+        Return the cell array of each word needed to display this time.
         """
+        # Phrase words are already upper case, as are the clock_words keys.
+        # A word placed more than once in the grid gets a random placement
+        clock_words = self.clock_words
         words = self.get_time_words(hour, minute)
-
-        print(words)
-
-        found = []
-
-        for w in words:
-            key = w.upper()
-            if key not in self.clock_words:
-                print(f"[WordSearch] Word '{key}' not found")
-                continue
-            found.append(random.choice(self.clock_words[key]))
+        found = [random.choice(clock_words[w]) for w in words if w in clock_words]
+        if len(found) != len(words):
+            print(f"[WordSearch] Words missing from grid: {words}")
         return found
 
     # Optional helper for debugging
@@ -230,6 +205,7 @@ class Manager(CLBManager):
         self.wordsearch_letter_delay_ms = settings["wordsearch_letter_delay_ms"]
         self.wordsearch_word_delay_ms = settings["wordsearch_word_delay_ms"]
         self.wordsearch_display_gap_ms = settings["wordsearch_display_gap_ms"]
+        self.debug = bool(settings.get("wordsearch_debug", False))
         self.alarm_enabled = bool(self.settings.get("alarm_enabled", False))
         self.alarm_hour = int(self.settings.get("alarm_hour", 7)) % 24
         self.alarm_min = int(self.settings.get("alarm_min", 0)) % 60
@@ -239,19 +215,30 @@ class Manager(CLBManager):
 
             if self.file in os.listdir("/"):
                 with open(self.file, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
-
-                self.words = self.data["words"]
+                    data = json.load(f)
+
+                # Flatten each word's cells into row,col byte pairs once so
+                # the render loops don't look up dicts and call int() per letter.
+                # Only the word and its pairs are kept; the parsed JSON is dropped
+                self.words = []
+                for w in data["words"]:
+                    cells = w["cells"]
+                    flat = bytearray(len(cells) * 2)
+                    for i, cell in enumerate(cells):
+                        flat[i * 2] = int(cell["row"])
+                        flat[i * 2 + 1] = int(cell["col"])
+                    self.words.append({"word": w["word"].upper(), "_cells": flat})
+                data = None
+                gc.collect()
                 
+                # Each word maps to the cell arrays of all its placements
                 self.clock_words = {}
                 for w in self.words:
-                    word = w["word"].upper()
+                    word = w["word"]
                     if not word in self.clock_words:
-                        self.clock_words[word]=[w]
+                        self.clock_words[word]=[w["_cells"]]
                     else:
-                        self.clock_words[word].append(w)
-                        
-                self.word_positions = {w["word"].upper(): w for w in self.words}
+                        self.clock_words[word].append(w["_cells"])
 
                 self.set_status(7001, f"Wordsearch {self.version} started")
                 self.state = self.STATE_OK
@@ -417,32 +404,39 @@ class Manager(CLBManager):
     def animate_words (self):
         try:
             self.show_state = self.ANIMATE_WORDS
+            # Locals are cheaper than attribute lookups in the loop below
+            draw_cells = self.pixels.draw_cells
+            show = self.pixels.show
+            wait = self.wait_yielding
+            # Work through the words in a shuffled order so every word gets
+            # drawn before any repeats, reshuffling once all have been used
+            order = list(self.words)
+            pos = len(order)
             self.pixels.fill(0, 0, 0)
-            self.pixels.show()
             while True:
-                x = random.choice(self.words)
-                colour = find_random_colour()
-                for cell in x["cells"]:
-                    row = int(cell["row"])
-                    col = int(cell["col"])
-                    self.pixels.set_rgb(row, col, colour[0], colour[1], colour[2])
-                    self.pixels.show()
-                    start = time.ticks_ms()
-                    while time.ticks_diff(time.ticks_ms(), start) < 5:
-                        yield  # pause until next frame
-                start = time.ticks_ms()
-                while time.ticks_diff(time.ticks_ms(), start) < 20:
-                    yield
+                if pos >= len(order):
+                    _shuffle(order)
+                    pos = 0
+                x = order[pos]
+                pos += 1
+                r, g, b = find_random_colour()
+                # The whole word goes out in a single refresh
+                draw_cells(x["_cells"], r, g, b)
+                show()
+                wait(20)
+                yield
                 if not self.show_state == self.ANIMATE_WORDS:
                     break
 
         except GeneratorExit:
-            print("Been told to stop")
+            if self.debug:
+                print("Been told to stop")
         except Exception as e:
             sys.print_exception(e)
             print(f"Something went wrong in animate_words:{e}")
         finally: 
-            print("Show words complete")
+            if self.debug:
+                print("Show words complete")
             self.show_state = self.SHOW_INACTIVE
         return
 
@@ -451,12 +445,8 @@ class Manager(CLBManager):
         fore_r,fore_g,fore_b=foreground
         self.pixels.fill(back_r, back_g, back_b)
         
-        for p in phrase:
-            cells = p.get("cells", [])
-            for cell in cells:
-                r = int(cell["row"])
-                c = int(cell["col"])
-                self.pixels.set_rgb(r, c, fore_r,fore_g, fore_b)
+        for cells in phrase:
+            self.pixels.draw_cells(cells, fore_r, fore_g, fore_b)
         
         self.pixels.show()
 
@@ -464,14 +454,13 @@ class Manager(CLBManager):
 
         found = []
         
-        words = self.number_words_to_sixty[number]
+        words = _NUMBER_WORDS_TO_SIXTY[number]
         
         for w in words:
-            key = w.upper()
-            if key not in self.clock_words:
-                print(f"[WordSearch] Word '{key}' not found")
+            if w not in self.clock_words:
+                print(f"[WordSearch] Word '{w}' not found")
                 continue
-            found.append(random.choice(self.clock_words[key]))
+            found.append(random.choice(self.clock_words[w]))
 
         self.phrase_display(found,background,foreground)
 
@@ -484,71 +473,89 @@ class Manager(CLBManager):
     def show_time(self):
         try:
             self.show_state = self.SHOW_TIME
+            letter_delay = self.wordsearch_letter_delay_ms
+            word_delay = self.wordsearch_word_delay_ms
+            gap = self.wordsearch_display_gap_ms
+            set_rgb = self.pixels.set_rgb
+            wait = self.wait_yielding
+            last_hm = None
             while self.show_state == self.SHOW_TIME:
                 hour,minute,second = self.clock.time()
+                # The phrase only changes with the minute; leave it on
+                # the panel until then rather than wiping and redrawing it
+                hm = (hour, minute)
+                if hm == last_hm:
+                    wait(gap)
+                    yield
+                    continue
+                last_hm = hm
                 phrase_words = self.get_word_positions_for_time(hour, minute)
 
                 self.pixels.fill(0, 0, 0)
-                self.pixels.show()
-
-                for p in phrase_words:
-                    colour = find_random_colour()
-                    cells = p.get("cells", [])
-                    for cell in cells:
-                        r = int(cell["row"])
-                        c = int(cell["col"])
-                        self.pixels.set_rgb(r, c, colour[0], colour[1], colour[2])
-                        self.pixels.show()
-                        last_update = time.ticks_ms()
-                        while time.ticks_ms() - last_update < self.wordsearch_letter_delay_ms:
-                            yield
-                    last_update = time.ticks_ms()
-                    while time.ticks_ms() - last_update < self.wordsearch_word_delay_ms:
+
+                # set_rgb refreshes the strip, one refresh per letter revealed.
+                # Words in a phrase can share a letter; it is drawn only once
+                painted = set()
+                for cells in phrase_words:
+                    r, g, b = find_random_colour()
+                    for i in range(0, len(cells), 2):
+                        cell = (cells[i] << 8) | cells[i + 1]
+                        if cell in painted:
+                            continue
+                        painted.add(cell)
+                        set_rgb(cells[i], cells[i + 1], r, g, b)
+                        wait(letter_delay)
                         yield
-                print("[WordSearch] Time phrase displayed:", " ".join(self.get_time_words(hour, minute)))
-                last_update = time.ticks_ms()
-                while time.ticks_ms() - last_update < self.wordsearch_display_gap_ms:
+                    wait(word_delay)
                     yield
+                if self.debug:
+                    print("[WordSearch] Time phrase displayed:", " ".join(self.get_time_words(hour, minute)))
+                wait(gap)
+                yield
         except GeneratorExit:
-            print("Been told to stop")
+            if self.debug:
+                print("Been told to stop")
         except Exception as e:
             sys.print_exception(e)
             print("Something went wrong")
         finally: 
-            print("Show time complete")
+            if self.debug:
+                print("Show time complete")
             self.show_state = self.SHOW_INACTIVE
         return
     
     def show_all_words(self):
         try:
             self.show_state = self.SHOW_WORDS
-            self.pixels.fill(0, 0, 0)
-            self.pixels.show()
+            letter_delay = self.wordsearch_letter_delay_ms
+            word_delay = self.wordsearch_word_delay_ms
+            set_rgb = self.pixels.set_rgb
+            fill = self.pixels.fill
+            wait = self.wait_yielding
+            fill(0, 0, 0)
             for x in self.words:
-                colour = find_random_colour()
-                for cell in x["cells"]:
-                    row = int(cell["row"])
-                    col = int(cell["col"])
-                    self.pixels.set_rgb(row, col, colour[0], colour[1], colour[2])
-                    self.pixels.show()
-                    start = time.ticks_ms()
-                    while time.ticks_diff(time.ticks_ms(), start) < self.wordsearch_letter_delay_ms:
-                        yield  # pause until next frame
-                start = time.ticks_ms()
-                while time.ticks_diff(time.ticks_ms(), start) < self.wordsearch_word_delay_ms:
-                    yield
-                self.pixels.fill(0, 0, 0)
-                self.pixels.show()
+                r, g, b = find_random_colour()
+                # set_rgb refreshes the strip, one refresh per letter revealed
+                cells = x["_cells"]
+                for i in range(0, len(cells), 2):
+                    set_rgb(cells[i], cells[i + 1], r, g, b)
+                    wait(letter_delay)
+                    yield  # pause until next frame
+                wait(word_delay)
+                yield
+                fill(0, 0, 0)
                 if not self.show_state == self.SHOW_WORDS:
                     break
 
         except GeneratorExit:
-            print("Been told to stop")
+            if self.debug:
+                print("Been told to stop")
         except Exception as e:
             sys.print_exception(e)
             print(f"Something went wrong in show_all_words:{e}")
         finally: 
-            print("Show words complete")
+            if self.debug:
+                print("Show words complete")
             self.show_state = self.SHOW_INACTIVE
         return
 
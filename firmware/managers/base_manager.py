@@ -1,9 +1,10 @@
+import time
 
 def console_printer(msg_id, msg_text):
     print(f"[{msg_id}] {msg_text}")
 
 class CLBManager:
-    version = "0.0.0"
+    version = "0.1.0"
 
     STATE_OK = "ok"
     STATE_STARTING = "starting"
@@ -28,6 +29,8 @@ class CLBManager:
         self.total_time_ms=0
         self.dependency_instances = []
         self.i2c=None
+        # Deadline set by wait_yielding, None while not waiting
+        self.next_wake = None
 
     def get_interface(self):
         """
@@ -171,6 +174,7 @@ class CLBManager:
         
         # Create new generator
         try:
+            self.next_wake = None
             self._current = fn(*args, **kwargs)
             self.yield_state = state_name or fn.__name__
             self.set_status(9999, f"State changed to {self.yield_state}")
@@ -189,6 +193,14 @@ class CLBManager:
         if not hasattr(self, "_current") or not self._current:
             return
 
+        # Asleep until the deadline set by wait_yielding. The deadline is
+        # cleared once reached, as ticks_diff is only meaningful for a
+        # deadline less than half the tick period away
+        if self.next_wake is not None:
+            if time.ticks_diff(self.next_wake, time.ticks_ms()) > 0:
+                return
+            self.next_wake = None
+
         try:
             next(self._current)
         except StopIteration:
@@ -202,6 +214,18 @@ class CLBManager:
             self.yield_state = "error"
             self.set_status(9996, f"Error in state: {e}")
 
+    def wait_yielding(self, ms):
+        """
+        Pause the yielding function for 'ms' milliseconds. Call it just
+        before a yield; update_yielding won't resume the generator until
+        the time has passed, instead of resuming it every update.
+
+        Example:
+            self.wait_yielding(500)
+            yield
+        """
+        self.next_wake = time.ticks_add(time.ticks_ms(), ms)
+
     def set_i2c(self,sda,scl):
         if self.i2c == None:
             from machine import I2C,Pin
@@ -30,9 +30,10 @@ except ImportError:
 DEFAULT_RANGE_SIZE = 2000     # number of bytes client asks for in each request
 FETCH_TIMEOUT_MS = 5000        # how long we wait for a response
 FETCH_REQUEST_RETRY_INTERVAL_MS = 1000
+DEPENDENCY_CHECK_INTERVAL_MS = 1000   # how often we re-check WiFi while waiting
 
 class Manager(CLBManager):
-    version = "4.0.1"
+    version = "4.0.2"
 
     STATE_WAITING = "waiting"
     STATE_CONNECTING = "connecting"
@@ -54,6 +55,7 @@ class Manager(CLBManager):
 
         self.client = None
         self.last_loop_time = 0
+        self._last_dep_check = 0
 
         # Active download state
         self._fetch = None
@@ -120,10 +122,20 @@ class Manager(CLBManager):
         self.topicbase = settings["topicbase"]
         self.filebase = settings["filebase"]
 
+        # Topics are fixed once configured, so encode them once here rather
+        # than formatting and comparing strings for every message
+        self._topic_prefix_b = (self.topicbase + "/").encode()
+        self._topic_command_b = self._topic_prefix_b + self.devicename.encode()
+        self._topic_fetch_b = f"{self.filebase}/{self.devicename}/fetch".encode()
+        self._topic_result_b = f"{self.filebase}/{self.devicename}/result".encode()
+
         if not self.mqtthost:
             self.state = self.STATE_ERROR
             return
 
+        # Due straight away; a value left from an earlier setup could be
+        # too far back for ticks_diff to measure
+        self._last_dep_check = time.ticks_add(time.ticks_ms(), -DEPENDENCY_CHECK_INTERVAL_MS)
         self.state = self.STATE_WAITING
 
     def unresolved_dependencies(self):
@@ -141,6 +153,10 @@ class Manager(CLBManager):
 
         # Wait for WiFi
         if self.state == self.STATE_WAITING:
+            now = time.ticks_ms()
+            if time.ticks_diff(now, self._last_dep_check) < DEPENDENCY_CHECK_INTERVAL_MS:
+                return
+            self._last_dep_check = now
             if self.unresolved_dependencies():
                 return
             self.state = self.STATE_CONNECTING
@@ -161,11 +177,11 @@ class Manager(CLBManager):
                 self.client.connect()
 
                 # Subscribe to incoming commands
-                self.client.subscribe(f"{self.topicbase}/{self.devicename}")
+                self.client.subscribe(self._topic_command_b)
 
                 # Subscribe to global file transfer topics
-                self.client.subscribe(f"{self.filebase}/{self.devicename}/fetch")
-                self.client.subscribe(f"{self.filebase}/{self.devicename}/result")
+                self.client.subscribe(self._topic_fetch_b)
+                self.client.subscribe(self._topic_result_b)
 
                 self.events["mqtt.connected"].publish({"device": self.devicename})
                 self.state = self.STATE_OK
@@ -193,16 +209,19 @@ class Manager(CLBManager):
     # MQTT callback
     # ---------------------------------------------------------------
     def _on_mqtt(self, topic, message):
-        topic = topic.decode()
+        # topic arrives as bytes; compare against the pre-encoded topics and
+        # only decode when something actually needs the text
         try:
-            payload = json.loads(message.decode())
+            payload = json.loads(message)
         except:
             payload = None
 
-        self.events["mqtt.message"].publish({"topic": topic, "payload": payload})
+        evt = self.events["mqtt.message"]
+        if evt.subscribers:
+            evt.publish({"topic": topic.decode(), "payload": payload})
 
         # Routing
-        if topic == f"{self.topicbase}/{self.devicename}":
+        if topic == self._topic_command_b:
             # CLI command routing
             try:
                 self.clb.handle_command(message.decode())
@@ -210,11 +229,11 @@ class Manager(CLBManager):
                 pass
             return
 
-        if topic == f"{self.filebase}/{self.devicename}/fetch":
+        if topic == self._topic_fetch_b:
             self._handle_range_request(payload)
             return
 
-        if topic == f"{self.filebase}/{self.devicename}/result":
+        if topic == self._topic_result_b:
             self._handle_range_response(payload)
             return
 
@@ -441,7 +460,7 @@ class Manager(CLBManager):
         return self.devicename
 
     def command_send(self, target, msg):
-        self.publish(f"{self.topicbase}/{target}", msg)
+        self.publish(self._topic_prefix_b + str(target).encode(), msg)
 
     def command_fetch_file(self, filename, dest=None, range_size=DEFAULT_RANGE_SIZE,source=None):
         return self.fetch_file(filename, dest, int(range_size),source)
@@ -453,7 +472,8 @@ class Manager(CLBManager):
     # Publishing helper
     # ---------------------------------------------------------------
     def publish(self, topic, payload):
-        print(f"Publishing {payload} to {topic}")
+        # Some topics are pre-encoded; log them as text like the rest
+        print(f"Publishing {payload} to {topic.decode() if isinstance(topic, bytes) else topic}")
         if self.client:
             if isinstance(payload, dict):
                 payload = json.dumps(payload)
@@ -14,7 +14,7 @@ from graphics.coord_map import CoordMap
 from graphics.animations import anim_wandering_sprites,anim_robot_sprites
 
 class Manager(CLBManager):
-    version = "1.0.1"
+    version = "1.0.2"
 
     STATE_PAUSED="paused"
 
@@ -116,6 +116,7 @@ class Manager(CLBManager):
             "raw_test": ("Show raw pixel: raw_test", self.command_raw_test),
             "fill": ("Fil with colour: fill <r> <g> <b>", self.command_fill_display),
             "set_rgb": ("Set pixel: set_rgb <x> <y> <r> <g> <b>", self.command_set_pixel_rgb),
+            "draw_cells": ("Set pixels without showing: draw_cells <x0,y0,x1,y1...> <r> <g> <b>", self.command_draw_cells),
             "set_brightness": ("Set brightness (0-1): <b>", self.command_set_pixel_brightness),
             "animate": ("Begin animation: animate", self.command_animate),
             "show": ("Show pixels: show",self.command_show),
@@ -154,6 +155,13 @@ class Manager(CLBManager):
     def command_set_pixel_rgb(self, x, y, r, g, b):
         self.lightPanel.set_pixel_rgb(x, y, r, g, b)
         self.lightPanel.show()
+
+    def command_draw_cells(self, cells, r, g, b):
+        # cells is a flat sequence of x,y pairs, such as a bytearray;
+        # from the console it arrives as a string like "0,1,2,1"
+        if isinstance(cells, str):
+            cells = bytearray(int(v) for v in cells.split(","))
+        self.lightPanel.set_pixels_rgb(cells, r, g, b)
         
     def command_set_pixel_brightness(self,b):
         self.lightPanel.set_brightness(b)
@@ -196,8 +204,10 @@ class Manager(CLBManager):
     def command_raw_test(self):
         print("Testing pixels with raw addressing")
         self.lightPanel.clear_col()
+        colour = self.lightPanel.colour_bytes(0,20,0)
+        buf = memoryview(self.lightPanel.buf)
         for p in range(0,self.map.pixel_bytes,3):
-                self.lightPanel.write_col(p,0,20,0)
+                buf[p:p+3] = colour
                 self.lightPanel.show()
                 time.sleep(0.1)
         print("Pixel Test complete")
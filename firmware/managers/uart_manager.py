@@ -4,12 +4,20 @@ import machine
 import time
 from machine import UART
 
+_PARITY = {"even": 0, "odd": 1}
+
+def _parse_parity(name):
+    # "None" (or anything unrecognised) means no parity
+    return _PARITY.get(str(name).lower())
+
 class Manager(CLBManager):
-    version = "1.0.1"
+    version = "1.0.2"
 
     STATE_DISABLED = "disabled"
     STATE_IDLE     = "idle"
 
+    _HELLO = b'Hello from CLB\r\n'
+
     def __init__(self, clb):
         super().__init__(clb, defaults={
             "channel": 0,
@@ -32,32 +40,31 @@ class Manager(CLBManager):
             return
 
         try:
-            if (self.settings["parity"].lower() == "even"):
-                self.parity = 0
-            elif (self.settings["parity"].lower() == "odd"):
-                self.parity = 1
-            else:
-                self.parity = None
-
-            self.channel = self.settings["channel"]
-            self.baud = self.settings["baud"]
-
-            self.uart = UART(self.channel, baudrate=self.baud, bits=self.settings["bits"], parity=self.parity, stop=self.settings["stop"]) 
-
+            self._configure_uart()
 
             self.state = self.STATE_OK
             self.set_status(8001, f"UART manager OK on channel {self.channel} at {self.baud} baud")
-            self.uart.write('Hello from uart mamanger setup\r\n')
+            self.uart.write(b'Hello from uart manager setup\r\n')
 
         except Exception as e:
             self.state = self.STATE_DISABLED
             self.set_status(8002, f"UART setup error: {e}")
 
+    # ---------------------------------------------------------------------
+    # UART CONFIGURATION (shared by setup and init)
+    # ---------------------------------------------------------------------
+    def _configure_uart(self):
+        self.parity = _parse_parity(self.settings["parity"])
+        self.channel = self.settings["channel"]
+        self.baud = self.settings["baud"]
+
+        self.uart = UART(self.channel, baudrate=self.baud, bits=self.settings["bits"], parity=self.parity, stop=self.settings["stop"])
+
     # ---------------------------------------------------------------------
     # SAY HELLO
     # ---------------------------------------------------------------------
     def hello(self):
-        self.uart.write('Hello from CLB\r\n')
+        self.uart.write(self._HELLO)
         self.state = self.STATE_OK       # still OK
         self.set_status(8003, "Said hello")
 
@@ -66,41 +73,16 @@ class Manager(CLBManager):
     # ---------------------------------------------------------------------
     def init(self):
         try:
-            if (self.settings["parity"].lower() == "even"):
-                self.parity = 0
-            elif (self.settings["parity"].lower() == "odd"):
-                self.parity = 1
-            else:
-                self.parity = None
-
-            self.channel = self.settings["channel"]
-            self.baud = self.settings["baud"]
-
-            self.uart = UART(self.channel, baudrate=self.baud, bits=self.settings["bits"], parity=self.parity, stop=self.settings["stop"]) 
+            self._configure_uart()
 
             self.state = self.STATE_OK
             self.set_status(8001, f"UART initialised on channel {self.channel} at {self.baud} baud")
-            self.uart.write('UART initialised\r\n')
+            self.uart.write(b'UART initialised\r\n')
 
         except Exception as e:
             self.state = self.STATE_DISABLED
             self.set_status(8002, f"UART initialization error: {e}")
 
-    # ---------------------------------------------------------------------
-    # UPDATE LOOP
-    # ---------------------------------------------------------------------
-    def update(self):
-        if not self.enabled:
-            return
-
-        if self._gen:
-            try:
-                next(self._gen)
-            except StopIteration:
-                self._gen = None
-                self.state = self.STATE_OK
-
-
     # ---------------------------------------------------------------------
     # TEARDOWN
     # ---------------------------------------------------------------------
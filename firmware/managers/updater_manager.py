@@ -2,7 +2,7 @@
 #
 # Full updater:
 #  - manifest fetch (via MQTT file.fetch)
-#  - recursive version comparison over all .py files
+#  - version comparison over all .py files (iterative tree walk)
 #  - safe file download via MQTT (filename.new)
 #  - verify + atomic rename
 #  - non-blocking state machine using _phase
@@ -12,20 +12,91 @@
 #
 
 import os
-import json
+import re
+try:
+    import ujson as json
+except Exception:
+    import json
 from managers.base_manager import CLBManager
 from managers.event import Event
 
-MANIFEST_REMOTE = "manifest.json"          # upstream (server or peer)
+try:
+    import hashlib
+    import binascii
+except ImportError:
+    hashlib = None
+
+MANIFEST_REMOTE = "manifest.tsv"           # upstream (server or peer), "path<TAB>version<TAB>sha" lines
+MANIFEST_REMOTE_JSON = "manifest.json"     # fallback for sources without the TSV form
 MANIFEST_LOCAL  = "manifest_local.json"    # generated locally
 MANIFEST_TMP    = "_manifest_tmp.json"     # temp download target
+MANIFEST_TMP_TSV = "_manifest_tmp.tsv"     # temp download target for the TSV form
+MANIFEST_STAT   = "_manifest_stat.json"    # size/mtime/version/sha of each file at the last scan
+
+# version = "x.y.z" at the start of a line (indent allowed), searched with the
+# C regex engine over whole blocks of a file rather than line by line
+_VERSION_RE = re.compile(b"""(?:^|\n)[ \t]*version[ \t]*=[ \t]*["']([^"']+)["']""")
+_VERSION_BLOCK = 4096
+
+# Directories the local version scan never enters
+_IGNORE_DIRS = {"__pycache__", ".git", ".vscode", ".mypy_cache", ".pytest_cache"}
+
+
+def _exists(path):
+    # MicroPython ports don't all provide os.path; os.stat works everywhere
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+_rename_replaces_result = None
+
+def _rename_replaces():
+    # littlefs replaces an existing target on rename, FAT refuses; probed
+    # once with two scratch files the first time an update is installed
+    global _rename_replaces_result
+    if _rename_replaces_result is None:
+        a, b = "_rename_a.tmp", "_rename_b.tmp"
+        try:
+            for name in (a, b):
+                with open(name, "w") as fp:
+                    fp.write(name)
+            os.rename(a, b)
+            _rename_replaces_result = True
+        except OSError:
+            _rename_replaces_result = False
+        for name in (a, b):
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+    return _rename_replaces_result
+
+
+class _Scan:
+    # State of one walk of the local tree. The background scan and the
+    # one-shot walk for commands each get their own, so they can overlap
+    def __init__(self, fp):
+        # Walk the tree with an explicit stack of directories rather than
+        # recursing, which costs a Python frame per directory level
+        self.stack = ["."]
+        # Versions are either collected in a dict or streamed straight
+        # into manifest_local.json, never both
+        self.versions = None if fp else {}
+        self.fp = fp
+        self.sep = ""
+        # Files whose size and mtime match the last scan are not reopened
+        self.cache = {}
 
 
 class Manager(CLBManager):
-    version = "3.1.1"
+    version = "3.1.2"
 
     (
         PHASE_IDLE,
+        PHASE_SCAN,
         PHASE_WAIT_MANIFEST,
         PHASE_COMPARE,
         PHASE_PREP_FILE,
@@ -33,19 +104,46 @@ class Manager(CLBManager):
         PHASE_WAIT_FILE,
         PHASE_DONE,
         PHASE_ERROR,
-    ) = range(8)
+    ) = range(9)
 
     def __init__(self, clb):
         super().__init__(clb, defaults={
             "enabled": True,
             "source": "",     # optional source device name; empty = server
+            "chunk_bytes": 4096,  # bytes requested per MQTT file range message
+            "debug": False,   # print trace messages for every step and file
         })
 
         self._phase = self.PHASE_IDLE
+        self._debug = False
+        self._chunk = 4096
         self._full_update = False  # True for updater.update, False for check*
-        self.ctx = None
+        self._fetch_manifest = True  # False for check_local
+        # Per-run state, reset by _start_process
+        self._manifest = None          # filename of the downloaded manifest
+        self._pending = []
+        self._newer = []
+        self._remote_sha = {}          # manifest sha of each file that differs
+        self._current_file = None
+        self._ver_cache = {}           # version string -> parsed tuple, during _compare_manifest
         self.mqtt = None
 
+        # Local tree walk, advanced one directory per update() tick
+        self._scan = None
+
+        # Reused between runs while the underlying files are unchanged
+        self._version_cache = None     # normalised path -> ((size, mtime), version, sha), loaded from MANIFEST_STAT
+        self._version_cache_dirty = False
+
+        # Work to do on each update() tick, by phase
+        self._phase_dispatch = {
+            self.PHASE_SCAN:         self._scan_tick,
+            self.PHASE_COMPARE:      self._compare_manifest,
+            self.PHASE_PREP_FILE:    self._prep_next_file,
+            self.PHASE_REQUEST_FILE: self._request_file,
+            self.PHASE_DONE:         self._on_phase_done,
+        }
+
         self.events = {
             "check.start":        Event("check.start", "Check start", self),
             "check.complete":     Event("check.complete", "Check complete", self),
@@ -64,33 +162,41 @@ class Manager(CLBManager):
     def setup(self, settings):
         super().setup(settings)
         self.source = settings["source"] or None
-        print("[UPD] setup complete")
+        self._debug = bool(settings.get("debug", False))
+        self._chunk = int(settings.get("chunk_bytes", 4096))
+        if self._debug:
+            print("[UPD] setup complete")
 
     def setup_services(self):
-        print("[UPD] setup_services")
+        if self._debug:
+            print("[UPD] setup_services")
 
         self.mqtt = self.get_service_handle("mqtt")
         if not self.mqtt:
             print("[UPD] MQTT not available — updater idle")
             return
 
-        print("[UPD] MQTT resolved")
+        if self._debug:
+            print("[UPD] MQTT resolved")
 
         evt = self.clb.get_event("file.fetch_complete")
         if evt:
             evt.subscribe(self._on_fetch_complete)
-            print("[UPD] Bound to file.fetch_complete")
+            if self._debug:
+                print("[UPD] Bound to file.fetch_complete")
         else:
             print("[UPD] WARNING: file.fetch_complete event not found")
 
         evt = self.clb.get_event("file.fetch_error")
         if evt:
             evt.subscribe(self._on_fetch_error)
-            print("[UPD] Bound to file.fetch_error")
+            if self._debug:
+                print("[UPD] Bound to file.fetch_error")
         else:
             print("[UPD] WARNING: file.fetch_error event not found")
 
-        print("[UPD] Updater service wiring complete")
+        if self._debug:
+            print("[UPD] Updater service wiring complete")
 
     # ---------------------------------------------------------
     # COMMAND INTERFACE
@@ -113,8 +219,7 @@ class Manager(CLBManager):
         self._start_process(full_update=True, fetch_manifest=True)
 
     def command_show_versions(self):
-        for f, v in self._read_local_versions().items():
-            print(f"{f}: {v}")
+        print("\n".join(f + ": " + v for f, v in self._read_local_versions().items()))
 
     # ---------------------------------------------------------
     # PROCESS START
@@ -130,15 +235,13 @@ class Manager(CLBManager):
             return
 
         self._full_update = full_update
+        self._fetch_manifest = fetch_manifest
 
-        self.ctx = {
-            "manifest": None,
-            "pending": [],
-            "newer":[],
-            "current": None,
-        }
-
-        self._build_local_manifest()
+        self._manifest = None
+        self._pending = []
+        self._newer = []
+        self._remote_sha = {}
+        self._current_file = None
 
         if full_update:
             self.events["update.start"].publish({})
@@ -147,52 +250,63 @@ class Manager(CLBManager):
 
         self.set_status(5600, "Updater: starting")
 
-        if fetch_manifest:
-            print(f"[UPD] Requesting {MANIFEST_REMOTE} (source={self.source})")
-            self.mqtt.fetch_file(MANIFEST_REMOTE, MANIFEST_TMP, RANGE, self.source)
+        # The local tree is walked over the following update() ticks
+        # so other managers keep running while it is read
+        try:
+            self._scan = self._scan_start(write_local=True)
+        except Exception as e:
+            self._fail("Failed to write manifest_local.json: " + str(e))
+            return
+        self._phase = self.PHASE_SCAN
+
+    def _scan_tick(self):
+        scan = self._scan
+        try:
+            if not self._scan_step(scan):
+                return
+        except Exception as e:
+            try:
+                scan.fp.close()
+            except:
+                pass
+            self._scan = None
+            self._fail("Failed to write manifest_local.json: " + str(e))
+            return
+        self._scan = None
+
+        if self._debug:
+            print("[UPD] Built manifest_local.json")
+
+        if self._fetch_manifest:
+            if self._debug:
+                print(f"[UPD] Requesting {MANIFEST_REMOTE} (source={self.source})")
+            self.mqtt.fetch_file(MANIFEST_REMOTE, MANIFEST_TMP_TSV, self._chunk, self.source)
             self._phase = self.PHASE_WAIT_MANIFEST
         else:
-            if not os.path.exists(MANIFEST_REMOTE):
-                self._fail("No cached manifest available")
-                return
-            self._load_manifest(MANIFEST_REMOTE)
+            for name in (MANIFEST_REMOTE, MANIFEST_REMOTE_JSON):
+                if _exists(name):
+                    self._load_manifest(name)
+                    return
+            self._fail("No cached manifest available")
 
     # ---------------------------------------------------------
     # NON-BLOCKING UPDATE LOOP
     # ---------------------------------------------------------
     def update(self):
-        if self._phase == self.PHASE_IDLE:
-            return
-
-        elif self._phase == self.PHASE_WAIT_MANIFEST:
-            return  # waiting for fetch_complete
-
-        elif self._phase == self.PHASE_COMPARE:
-            self._compare_manifest()
-            return
-
-        elif self._phase == self.PHASE_PREP_FILE:
-            self._prep_next_file()
-            return
+        # Phases that only wait for an event (IDLE, WAIT_MANIFEST,
+        # WAIT_FILE, ERROR) have no handler
+        handler = self._phase_dispatch.get(self._phase)
+        if handler:
+            handler()
 
-        elif self._phase == self.PHASE_REQUEST_FILE:
-            self._request_file()
-            return
-
-        elif self._phase == self.PHASE_WAIT_FILE:
-            return  # waiting for fetch_complete
-
-        elif self._phase == self.PHASE_DONE:
-            if self._full_update:
-                self.events["update.complete"].publish({})
-            else:
-                self.events["check.complete"].publish({})
-            self._phase = self.PHASE_IDLE
+    def _on_phase_done(self):
+        if self._full_update:
+            self.events["update.complete"].publish({})
+        else:
+            self.events["check.complete"].publish({})
+        self._phase = self.PHASE_IDLE
+        if self._debug:
             print("[UPD] process complete → idle")
-            return
-
-        elif self._phase == self.PHASE_ERROR:
-            return
 
     # ---------------------------------------------------------
     # EVENT HANDLERS
@@ -202,125 +316,216 @@ class Manager(CLBManager):
         file = data["file"]
         size = data.get("bytes", 0)
 
-        print(f"[UPD] fetch_complete: {file} → {dest} ({size} bytes)")
+        if self._debug:
+            print(f"[UPD] fetch_complete: {file} → {dest} ({size} bytes)")
 
         # Manifest
-        if dest == MANIFEST_TMP and self._phase == self.PHASE_WAIT_MANIFEST:
-            self._load_manifest(MANIFEST_TMP)
+        if dest in (MANIFEST_TMP_TSV, MANIFEST_TMP) and self._phase == self.PHASE_WAIT_MANIFEST:
+            self._load_manifest(dest)
             return
 
         # File for update
         if self._phase == self.PHASE_WAIT_FILE:
             try:
-                self._apply_file_update(self.ctx["current"])
+                self._apply_file_update(self._current_file)
             except Exception as e:
                 self._fail("File apply failed: " + str(e))
                 return
 
             self.events["update.file_done"].publish({"file": file})
-            self._phase = self.PHASE_PREP_FILE
+
+            # Request the next file straight away rather than spending two
+            # more update() ticks in PREP_FILE and REQUEST_FILE
+            self._prep_next_file()
+            if self._phase == self.PHASE_REQUEST_FILE:
+                self._request_file()
 
     def _on_fetch_error(self, event, data):
-        print("[UPD] fetch_error:", data)
+        if self._debug:
+            print("[UPD] fetch_error:", data)
+
+        # Older sources only publish manifest.json
+        if self._phase == self.PHASE_WAIT_MANIFEST and data.get("dest") == MANIFEST_TMP_TSV:
+            if self._debug:
+                print(f"[UPD] {MANIFEST_REMOTE} unavailable, requesting {MANIFEST_REMOTE_JSON}")
+            self.mqtt.fetch_file(MANIFEST_REMOTE_JSON, MANIFEST_TMP, self._chunk, self.source)
+            return
+
         self._fail("Fetch error: " + str(data))
 
     # ---------------------------------------------------------
     # MANIFEST LOADING
     # ---------------------------------------------------------
     def _load_manifest(self, filename):
-        print(f"[UPD] Reading manifest from {filename}")
-        try:
-            with open(filename) as fp:
-                self.ctx["manifest"] = json.load(fp)
-        except Exception as e:
-            self._fail("Manifest parse error: " + str(e))
+        # The manifest is not read here: _compare_manifest streams its
+        # entries so that the whole document is never held in memory
+        if not _exists(filename):
+            self._fail("Manifest missing: " + filename)
             return
-
+        if self._debug:
+            print(f"[UPD] Using manifest {filename}")
+        self._manifest = filename
         self._phase = self.PHASE_COMPARE
 
+    def _manifest_entries(self, filename):
+        if filename.endswith(".tsv"):
+            return self._tsv_manifest_entries(filename)
+        return self._json_manifest_entries(filename)
+
+    def _tsv_manifest_entries(self, filename):
+        # One "path<TAB>version[<TAB>sha]" line per file
+        with open(filename) as fp:
+            for line in fp:
+                parts = line.rstrip("\r\n").split("\t")
+                if len(parts) >= 2 and parts[0]:
+                    yield parts[0], parts[1], parts[2] if len(parts) > 2 else None
+
+    def _json_manifest_entries(self, filename):
+        # Minimal streaming JSON reader. Yields (path, version, sha) for
+        # every "path": {"version": ..., "sha": ...} object, whether under
+        # "files" or at the top level, while holding one 512 byte chunk and
+        # one string. Escapes are only unwrapped (\" and \\), which is all
+        # paths need.
+        parents = []        # (key, in_obj) of each enclosing object/array
+        key = None          # last key read in the current object
+        in_obj = False
+        want_key = False
+        ver = sha = None    # fields of the innermost object
+        text = None         # characters of the string being read
+        esc = False
+        with open(filename) as fp:
+            while True:
+                chunk = fp.read(512)
+                if not chunk:
+                    break
+                for c in chunk:
+                    if text is not None:
+                        if esc:
+                            text.append(c)
+                            esc = False
+                        elif c == "\\":
+                            esc = True
+                        elif c == '"':
+                            value = "".join(text)
+                            text = None
+                            if want_key:
+                                key = value
+                            elif key == "version":
+                                ver = value
+                            elif key == "sha":
+                                sha = value
+                        else:
+                            text.append(c)
+                    elif c == '"':
+                        text = []
+                    elif c == ":":
+                        want_key = False
+                    elif c == ",":
+                        want_key = in_obj
+                    elif c == "{" or c == "[":
+                        parents.append((key, in_obj))
+                        in_obj = c == "{"
+                        want_key = in_obj
+                        key = None
+                        ver = sha = None
+                    elif c == "}" or c == "]":
+                        if in_obj and ver is not None and len(parents) > 1:
+                            yield parents[-1][0], ver, sha
+                        key, in_obj = parents.pop()
+                        want_key = False
+                        ver = sha = None
+
     def _parse_version(self, v):
-        return tuple(int(p) for p in v.split("."))
+        # Most files share a handful of version strings, so each is
+        # parsed once per comparison run
+        t = self._ver_cache.get(v)
+        if t is None:
+            t = tuple(int(p) for p in v.split("."))
+            self._ver_cache[v] = t
+        return t
 
     # ---------------------------------------------------------
     # VERSION COMPARISON (robust manifest iteration)
     # ---------------------------------------------------------
     def _compare_manifest(self):
-        manifest = self.ctx["manifest"]
-        if manifest is None:
+        if self._manifest is None:
             self._fail("No manifest loaded")
             return
 
-        # Manifest may be:
-        #  { "version_id": "...", "generated_at": "...", "files": { "path": {...}, ... } }
-        # or directly:
-        #  { "path": { "version": "...", "sha": "..." }, ... }
-        if isinstance(manifest, dict) and "files" in manifest and isinstance(manifest["files"], dict):
-            files_section = manifest["files"]
-            print("[UPD] Using manifest['files'] for comparison")
-        else:
-            files_section = manifest
-            print("[UPD] Using top-level manifest entries for comparison")
-
-        local_versions = self._read_local_versions()
         pending = []
         newer = []
 
-        print("[UPD] Comparing versions…")
+        if self._debug:
+            print("[UPD] Comparing versions…")
 
-        for fname, entry in files_section.items():
-            if not isinstance(entry, dict):
-                # Skip non-file keys like "generated_at", "manifest_version" if they exist here
-                print(f"[UPD] Skipping non-dict manifest entry: {fname}")
-                continue
+        try:
+            for fname, remote, sha in self._manifest_entries(self._manifest):
+                # Only the files the manifest names are looked at
+                path = self._normalize_manifest_path(fname)
+                local = self._local_version_of(path)
 
-            remote = entry.get("version", None)
-            
-            if remote is None:
-                print(f"[UPD] No 'version' field for {fname} in manifest; skipping")
-                continue
+                if self._debug:
+                    print(f"[UPD] {fname}: device={fname} local={local} remote={remote}")
 
-            local = local_versions.get(fname)
+                # Identical strings are the usual case; only parse when they differ
+                if local is not None and local == remote:
+                    continue
 
-            print(f"[UPD] {fname}: device={fname} local={local} remote={remote}")
+                # Unversioned or differing files: an identical content hash
+                # means there is nothing to fetch whatever the versions say
+                if sha and self._local_sig_of(path) == sha:
+                    continue
+                if sha:
+                    self._remote_sha[fname] = sha
 
-            # Missing locally → needs download
-            if local is None:
-                pending.append(fname)
-                continue
+                # Missing locally → needs download
+                if local is None:
+                    pending.append(fname)
+                    continue
 
-            try:
-                lv = self._parse_version(local)
-                rv = self._parse_version(remote)
-            except Exception:
-                # If versions are malformed, be conservative
-                pending.append(fname)
-                continue
+                try:
+                    lv = self._parse_version(local)
+                    rv = self._parse_version(remote)
+                except Exception:
+                    # If versions are malformed, be conservative
+                    pending.append(fname)
+                    continue
 
-            if lv < rv:
-                # Local older → update
-                pending.append(fname)
+                if lv < rv:
+                    # Local older → update
+                    pending.append(fname)
 
-            elif lv > rv:
-                # Local newer → warn only
-                newer.append({
-                    "file": fname,
-                    "local": local,
-                    "remote": remote
-                })
+                elif lv > rv:
+                    # Local newer → warn only
+                    newer.append({
+                        "file": fname,
+                        "local": local,
+                        "remote": remote
+                    })
 
-            # else: equal → do nothing
+                # else: numerically equal (e.g. "1.0" vs "1.0.0") → do nothing
+        except Exception as e:
+            self._fail("Manifest parse error: " + str(e))
+            return
 
-        self.ctx["pending"] = pending
-        self.ctx["newer"] = newer
+        self._ver_cache = {}
+        self._pending = pending
+        self._newer = newer
+        self._save_version_cache()
 
         if not self._full_update:
-            print("[UPD] CHECK ONLY — pending updates:")
-            for f in pending:
-                print("   →", f)
+            # Collected and written with a single print
+            if pending:
+                lines = ["[UPD] CHECK ONLY — pending updates:"]
+                for f in pending:
+                    lines.append("   → " + f)
+            else:
+                lines = ["[UPD] CHECK ONLY — no pending updates"]
             if newer:
-                print("[UPD] WARNING: local files newer than manifest:")
+                lines.append("[UPD] WARNING: local files newer than manifest:")
                 for n in newer:
-                    print(f"   {n['file']}: local={n['local']} remote={n['remote']}")
+                    lines.append("   " + n["file"] + ": local=" + n["local"] + " remote=" + n["remote"])
+            print("\n".join(lines))
             self._phase = self.PHASE_DONE
             return
 
@@ -331,15 +536,16 @@ class Manager(CLBManager):
     # UPDATE: PREP NEXT FILE
     # ---------------------------------------------------------
     def _prep_next_file(self):
-        if not self.ctx["pending"]:
+        if not self._pending:
             print("[UPD] All files updated")
             self._phase = self.PHASE_DONE
             return
 
-        fname = self.ctx["pending"].pop(0)
-        self.ctx["current"] = fname
+        fname = self._pending.pop(0)
+        self._current_file = fname
 
-        print(f"[UPD] Preparing update for: {fname}")
+        if self._debug:
+            print(f"[UPD] Preparing update for: {fname}")
         self.events["update.file_start"].publish({"file": fname})
 
         self._phase = self.PHASE_REQUEST_FILE
@@ -348,11 +554,27 @@ class Manager(CLBManager):
     # REQUEST FILE DOWNLOAD (to .new)
     # ---------------------------------------------------------
     def _request_file(self):
-        fname = self.ctx["current"]
+        fname = self._current_file
         temp = fname + ".new"
 
-        print(f"[UPD] Requesting download: {fname} → {temp}")
-        self.mqtt.fetch_file(fname, temp, RANGE, self.source)
+        # A complete download left behind by an interrupted run is
+        # installed as it is rather than fetched again
+        sha = self._remote_sha.get(fname)
+        if sha and _exists(temp) and self._file_sha256(temp) == sha:
+            if self._debug:
+                print(f"[UPD] Already downloaded: {temp}")
+            try:
+                self._apply_file_update(fname)
+            except Exception as e:
+                self._fail("File apply failed: " + str(e))
+                return
+            self.events["update.file_done"].publish({"file": fname})
+            self._phase = self.PHASE_PREP_FILE
+            return
+
+        if self._debug:
+            print(f"[UPD] Requesting download: {fname} → {temp}")
+        self.mqtt.fetch_file(fname, temp, self._chunk, self.source)
         self._phase = self.PHASE_WAIT_FILE
 
     # ---------------------------------------------------------
@@ -361,7 +583,8 @@ class Manager(CLBManager):
     def _apply_file_update(self, filename):
         newfile = filename + ".new"
 
-        print(f"[UPD] Verifying downloaded file: {newfile}")
+        if self._debug:
+            print(f"[UPD] Verifying downloaded file: {newfile}")
 
         try:
             st = os.stat(newfile)
@@ -372,14 +595,18 @@ class Manager(CLBManager):
         if size <= 0:
             raise RuntimeError("Downloaded file is empty")
 
-        print(f"[UPD] Download OK ({size} bytes)")
+        if self._debug:
+            print(f"[UPD] Download OK ({size} bytes)")
 
-        # Remove old file if exists
-        try:
-            os.remove(filename)
-            print(f"[UPD] Removed old: {filename}")
-        except:
-            pass
+        # Remove old file if exists, unless the rename below replaces it
+        # in one step and so never leaves the file missing
+        if not _rename_replaces():
+            try:
+                os.remove(filename)
+                if self._debug:
+                    print(f"[UPD] Removed old: {filename}")
+            except:
+                pass
 
         # Atomic rename
         try:
@@ -393,69 +620,203 @@ class Manager(CLBManager):
     # READ VERSIONS (MicroPython safe, full tree)
     # ---------------------------------------------------------
     def _read_local_versions(self):
-        versions = {}
-        IGNORE = {"__pycache__", ".git", ".vscode"}
-
-        print("[UPD] Scanning local files for version=…")
-
-        def scan(path):
-            try:
-                items = os.listdir(path)
-            except:
-                return
+        # Runs the whole walk at once, for commands that want the result now.
+        # It has its own walk state, so a background scan can be under way
+        scan = self._scan_start(write_local=False)
+        while not self._scan_step(scan):
+            pass
+        return scan.versions
+
+    def _scan_start(self, write_local):
+        if self._debug:
+            print("[UPD] Scanning local files for version=…")
+
+        fp = None
+        if write_local:
+            fp = open(MANIFEST_LOCAL, "w")
+            fp.write('{"files": {')
+        return _Scan(fp)
+
+    def _scan_step(self, scan):
+        """Read one directory of the local tree; return True once the walk is complete."""
+        stack = scan.stack
+        versions = scan.versions
+        fp = scan.fp
+        cache = self._get_version_cache()
+        new_cache = scan.cache
+
+        path = stack.pop()
+        try:
+            # ilistdir gives the entry type with the name, so only
+            # the .py files need a separate stat
+            items = os.ilistdir(path)
+        except:
+            items = ()
 
-            for name in items:
-                full = path + "/" + name if path else name
+        # One prefix per directory; each entry then costs a single join
+        sep = path + "/"
+        for item in items:
+            name = item[0]
 
-                try:
-                    st = os.stat(full)
-                except:
-                    continue
+            # Directory
+            if item[1] == 0x4000:
+                if name not in _IGNORE_DIRS:
+                    stack.append(sep + name)
+                continue
 
-                mode = st[0]
+            if not name.endswith(".py"):
+                continue
 
-                # Directory
-                if mode & 0x4000:
-                    if name not in IGNORE:
-                        scan(full)
-                    continue
+            full = sep + name
+            try:
+                st = os.stat(full)
+            except:
+                continue
 
-                # Python source file
-                if not full.endswith(".py"):
-                    continue
+            # Big enough to hold a version line
+            if st[6] < 20:
+                continue
 
-                try:
-                    with open(full) as fp:
-                        for line in fp:
-                            if "version" in line and "=" in line:
-                                ver = line.split("=", 1)[1].strip().strip('"\'')
-                                norm = self._normalize_fs_path(full)
+            norm = self._normalize_fs_path(full)
 
-                                # ONE canonical entry per file
-                                versions[norm] = ver
+            key = (st[6], st[8])
+            cached = cache.get(norm)
+            if cached and cached[0] == key:
+                new_cache[norm] = cached
+                ver = cached[1]
+            else:
+                ver = self._extract_version(full)
+                new_cache[norm] = (key, ver, None)
+                self._version_cache_dirty = True
 
-                                print(f"[UPD] Found version: {norm} = {ver}")
-                                break
-                except Exception as e:
-                    print("[UPD] Cannot read", full, ":", e)
+            if ver is None:
+                continue
 
-        scan(".")
-        return versions
+            # ONE canonical entry per file
+            if fp:
+                fp.write(scan.sep + json.dumps(norm) + ': {"version": ' + json.dumps(ver) + "}")
+                scan.sep = ", "
+            else:
+                versions[norm] = ver
+
+            if self._debug:
+                print(f"[UPD] Found version: {norm} = {ver}")
+
+        if stack:
+            return False
+
+        if len(new_cache) != len(cache):
+            # files were removed
+            self._version_cache_dirty = True
+        self._version_cache = new_cache
+        if fp:
+            fp.write("}}")
+            fp.close()
+            scan.fp = None
+        self._save_version_cache()
+        return True
+
+    def _local_version_of(self, path):
+        """Return the version of a single local file, or None if it is missing or unversioned."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        key = (st[6], st[8])
+        cache = self._get_version_cache()
+        cached = cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        ver = self._extract_version(path)
+        cache[path] = (key, ver, None)
+        self._version_cache_dirty = True
+        return ver
+
+    def _local_sig_of(self, path):
+        """Return the hex sha256 of a local file, as listed in the manifest, or None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        key = (st[6], st[8])
+        cache = self._get_version_cache()
+        cached = cache.get(path)
+        if cached and cached[0] == key:
+            if cached[2]:
+                return cached[2]
+            ver = cached[1]
+        else:
+            ver = self._extract_version(path)
+
+        # Hashed only on demand and then kept with the version
+        sig = self._file_sha256(path)
+        cache[path] = (key, ver, sig)
+        self._version_cache_dirty = True
+        return sig
+
+    def _get_version_cache(self):
+        # Loaded from flash on first use so the cache survives a reboot
+        if self._version_cache is None:
+            self._version_cache = {}
+            try:
+                with open(MANIFEST_STAT) as fp:
+                    # One read hands the C parser the whole file at once
+                    for path, entry in json.loads(fp.read()).items():
+                        sig = entry[3] if len(entry) > 3 else None
+                        self._version_cache[path] = ((entry[0], entry[1]), entry[2], sig)
+            except Exception:
+                pass
+        return self._version_cache
 
+    def _save_version_cache(self):
+        if not self._version_cache_dirty:
+            return
+        try:
+            with open(MANIFEST_STAT, "w") as fp:
+                json.dump({path: [key[0], key[1], ver, sig] for path, (key, ver, sig) in self._version_cache.items()}, fp)
+            self._version_cache_dirty = False
+        except Exception as e:
+            print("[UPD] Cannot write", MANIFEST_STAT, ":", e)
 
-    def _build_local_manifest(self):
-        versions = self._read_local_versions()
-        manifest = {"files": {}}
+    def _extract_version(self, full):
+        """Return the value of the first 'version = "x.y.z"' line in a file, or None."""
+        try:
+            with open(full, "rb") as fp:
+                tail = b""
+                while True:
+                    block = fp.read(_VERSION_BLOCK)
+                    if not block:
+                        return None
+                    data = tail + block
+                    m = _VERSION_RE.search(data)
+                    if m:
+                        return m.group(1).decode()
+                    # carry the last partial line over into the next block
+                    i = data.rfind(b"\n")
+                    tail = data[i:] if i >= 0 else data
+        except Exception as e:
+            print("[UPD] Cannot read", full, ":", e)
+        return None
 
-        for path, ver in versions.items():
-            manifest["files"][path] = {"version": ver}
 
+    def _file_sha256(self, path):
+        if hashlib is None:
+            return None
         try:
-            with open(MANIFEST_LOCAL, "w") as fp:
-                json.dump(manifest, fp)
-            print("[UPD] Built manifest_local.json")
+            h = hashlib.sha256()
+            with open(path, "rb") as fp:
+                while True:
+                    block = fp.read(_VERSION_BLOCK)
+                    if not block:
+                        break
+                    h.update(block)
+            return binascii.hexlify(h.digest()).decode()
         except Exception as e:
-            self._fail("Failed to write manifest_local.json: " + str(e))
+            print("[UPD] Cannot hash", path, ":", e)
+        return None
 
     # ---------------------------------------------------------
     # PATH NORMALISATION